@@ -28,42 +28,529 @@
 # e.g. to process all .log files in current and subdirectories into a single output file:
 # python jsonl_to_xlsx.py -r
 
+import collections
+import contextlib
+import datetime
+import decimal
 import json
+import mmap
+import numbers
 import os
 import traceback
 import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import pandas as pd
 import click
+from tqdm import tqdm
 
+# Fast JSON parser for the per-line hot path (orjson is Rust/SIMD, ujson is the C fallback)
+try:
+    import orjson as _json
+except ImportError:
+    try:
+        import ujson as _json
+    except ImportError:
+        _json = json
 
-# Convert to DataFrame and save to Excel/CSV
-def write_data_to_file(log_path, output_file_extension,output_path,excel_mode,data):
-    if data:
-        if not output_path.endswith(output_file_extension):
-            if os.path.isdir(output_path):
-                output_path = os.path.join(output_path, os.path.basename(log_path) + output_file_extension)
+# Only a handful of fields are read from each record, so prefer pysimdjson's lazy parser when
+# available: fields are pulled from the parsed tape on access instead of building a full dict.
+# The parser owns a reusable buffer, so keep a single instance for the whole run.
+try:
+    import simdjson
+    _parse_json_line = simdjson.Parser().parse
+    _simdjson_containers = (simdjson.Array, simdjson.Object)
+except ImportError:
+    _parse_json_line = _json.loads
+    _simdjson_containers = ()
+# Object/array values, however the parser returns them
+_non_scalar_types = (list, dict) + _simdjson_containers
+
+# xlsxwriter is the preferred (faster) Excel writer; openpyxl in write-only mode is the fallback
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# pyarrow's multi-threaded CSV writer is several times faster than DataFrame.to_csv on large frames
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+
+# Copy a simdjson Array/Object field out into a plain list/dict (other values are already plain)
+def _detach_field(value):
+    if isinstance(value, _simdjson_containers):
+        return value.as_list() if isinstance(value, simdjson.Array) else value.as_dict()
+    return value
+
+
+# Extract (i2c_address, timestamp, value, si_unit) from a single JSONL log line (bytes).
+# Fields are copied out here so no reference to the simdjson document outlives the call,
+# as the shared parser refuses to parse the next line while one is still held
+# (object/array fields come back as proxies into the document, so those are converted too).
+# The I2C address and SI unit become category columns (hashed per value), so an object/array in
+# either fails the line here rather than the whole file's transform later.
+def parse_log_line(line):
+    entry = _parse_json_line(line)
+    i2c_address = entry.get("i2c_address", "Unknown")
+    if isinstance(i2c_address, _non_scalar_types):
+        raise ValueError("i2c_address is not a single value")
+    si_unit = entry.get("si_unit", "Unknown")
+    if isinstance(si_unit, _non_scalar_types):
+        raise ValueError("si_unit is not a single value")
+    fields = (
+        i2c_address,
+        entry.get("timestamp", "Unknown"),
+        entry.get("value", "Unknown"),
+        si_unit,
+    )
+    if _simdjson_containers and any(isinstance(field, _simdjson_containers) for field in fields):
+        fields = tuple(_detach_field(field) for field in fields)
+    return fields
+
+
+# Yield each line of a log file as bytes (without the trailing newline). The file is memory-mapped
+# and split on b"\n" directly, avoiding a read syscall and text decode per line; the parsers take bytes.
+def iter_log_lines(log_file):
+    with open(log_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while True:
+                nl = mm.find(b"\n", start)
+                if nl < 0:
+                    break
+                yield mm[start:nl]
+                start = nl + 1
+            if start < len(mm):
+                yield mm[start:]  # last line without a trailing newline
+
+
+# Canonical (int) form of an I2C address, so config and log entries match whether they are written
+# as "0x4A", "0x4a" or 74. Returns None for anything that isn't an address (e.g. "Unknown").
+def normalize_i2c_address(address):
+    try:
+        return int(address, 0) if isinstance(address, str) else int(address)
+    except (TypeError, ValueError):
+        return None
+
+
+# Output columns, in order. Rows are accumulated column-wise (one list per column) rather than
+# as a dict per row, which avoids the per-row dict overhead and lets pandas build each column directly.
+LOG_COLUMNS = ("DateTime", "Timestamp", "Value", "SI Unit", "I2C Address", "Component", "Component@Address", "Board", "Filename")
+# Columns only kept when at least one row has a value (mapped component, known board, merged output)
+OPTIONAL_COLUMNS = ("Component", "Component@Address", "Board", "Filename")
+# Low-cardinality text columns (a handful of sensors/units per log), stored as pandas categories:
+# a small integer code per row instead of a Python str object each
+CATEGORY_COLUMNS = ("SI Unit", "I2C Address", "Component", "Component@Address", "Board", "Filename")
+
+
+# Largest timestamp magnitude (in seconds) converted to a DateTime, inside datetime64[ns]'s ~1677-2262 range
+MAX_TIMESTAMP_SECONDS = 9_000_000_000
+
+
+# Local UTC offset (in seconds) at a Unix timestamp, or None where the platform's localtime can't
+# represent it (e.g. negative timestamps on Windows)
+def local_utc_offset(timestamp):
+    try:
+        return time.localtime(timestamp).tm_gmtoff
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+# Build the DataFrame from the per-column lists, converting timestamps and mapping I2C addresses to
+# component names in vectorized passes. Optional columns that were never filled are dropped,
+# unless a fixed list of output columns is given.
+def columns_to_dataframe(data, i2c_mapping, columns=None):
+    df = pd.DataFrame(data, copy=False)
+    # Real (naive, local time) datetimes: written as Excel dates by xlsxwriter and as
+    # "YYYY-MM-DD HH:MM:SS" by to_csv. Missing/invalid timestamps are left blank.
+    # The local UTC offset is looked up once per distinct timestamp (a log has several readings per
+    # second) then applied as one array add; tz_convert(tzlocal()) calls back into Python per row.
+    timestamps = pd.to_numeric(df["Timestamp"], errors="coerce")
+    # Out-of-range timestamps (beyond datetime64[ns], or rejected by localtime) are left blank too
+    timestamps = timestamps.where(timestamps.abs() <= MAX_TIMESTAMP_SECONDS)
+    utc_offsets = {ts: local_utc_offset(ts) for ts in timestamps.dropna().unique()}
+    df["DateTime"] = pd.to_datetime(timestamps + timestamps.map(utc_offsets), unit="s")
+    # As a category, the mapping below only normalizes and looks up each distinct address once
+    df["I2C Address"] = df["I2C Address"].astype("category")
+    component = df["I2C Address"].map(normalize_i2c_address).map(i2c_mapping)
+    mapped = component.notna()
+    df["Component"] = component
+    # Only rows with a known component get "name@address", joined with a single vectorized str.cat
+    df["Component@Address"] = None
+    if mapped.any():
+        df.loc[mapped, "Component@Address"] = component[mapped].str.cat(df.loc[mapped, "I2C Address"].astype(str), sep="@")
+    if columns is None:
+        df = df[list(LOG_COLUMNS)]
+        df = df.drop(columns=[column for column in OPTIONAL_COLUMNS if df[column].isna().all()])
+    else:
+        df = df[list(columns)]
+    for column in CATEGORY_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+    return df
+
+
+# Excel's per-sheet row limit (including the header row)
+EXCEL_MAX_ROWS = 1048576
+# Rough lower bound on the size of one JSONL record, used to pre-size the per-column lists
+ESTIMATED_LINE_BYTES = 64
+# Number of lines parsed per batch (one try/except per batch on the happy path)
+PARSE_BATCH_LINES = 10000
+# Number of errors listed in the summary at the end of a run
+MAX_REPORTED_ERRORS = 5
+# Minimum total size of log files before parsing is spread over multiple processes
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Upper limit on parse worker processes (ProcessPoolExecutor's limit on Windows)
+MAX_PARSE_WORKERS = 61
+
+
+# Write a DataFrame's rows to an xlsxwriter worksheet starting at first_row, bypassing pandas' per-cell
+# formatting. Columns with a single known type get write_number/write_string directly to skip
+# xlsxwriter's type dispatch; anything else (mixed types, blanks, dates) goes through the generic write().
+def write_xlsxwriter_rows(worksheet, first_row, df):
+    writers = []
+    columns = []
+    for name in df.columns:
+        column = df[name]
+        has_blanks = column.isna().any()
+        if column.dtype.kind in "iuf" and not has_blanks:
+            writers.append(worksheet.write_number)
+            columns.append(column.tolist())
+        elif not has_blanks and pd.api.types.infer_dtype(
+                column.cat.categories if isinstance(column.dtype, pd.CategoricalDtype) else column, skipna=False) == "string":
+            writers.append(worksheet.write_string)
+            columns.append(column.tolist())
+        else:
+            writers.append(worksheet.write)
+            columns.append(column.astype(object).where(column.notna(), None).tolist())
+    for row, values in enumerate(zip(*columns), start=first_row):
+        for col, (write, value) in enumerate(zip(writers, values)):
+            write(row, col, value)
+
+
+# Types a cell can hold in both xlsxwriter and openpyxl (blanks are written as None)
+EXCEL_CELL_TYPES = (str, numbers.Real, decimal.Decimal, datetime.date, datetime.time, datetime.timedelta)
+
+
+# Raise TypeError if any value in the DataFrame can't be written to an Excel cell (e.g. a list or dict
+# value from the log). Checked before any row is written, so a bad frame never leaves a half-written row.
+def check_excel_values(df):
+    for name in df.columns:
+        column = df[name]
+        if column.dtype.kind in "biufmM":
+            continue
+        values = column.cat.categories if isinstance(column.dtype, pd.CategoricalDtype) else column.dropna()
+        for value_type in set(map(type, values)):
+            if not issubclass(value_type, EXCEL_CELL_TYPES):
+                raise TypeError(f"Unsupported {value_type.__name__} value in column {name!r} for Excel output")
+
+
+# Append a DataFrame's rows to an openpyxl write-only worksheet (blanks written as empty cells)
+def write_openpyxl_rows(worksheet, df):
+    columns = [df[name].astype(object).where(df[name].notna(), None).tolist() for name in df.columns]
+    for row in zip(*columns):
+        worksheet.append(row)
+
+
+# The output writers below are context managers yielding an append(df) function, so output can be
+# written a DataFrame at a time (e.g. one per log file when merging) instead of building one frame
+# for everything first. Appended frames must share the same columns. No file is created (and any
+# existing file at output_path is not backed up) until the first non-empty append.
+
+# Stream DataFrames into an .xlsx file. xlsxwriter is used in constant_memory mode (rows are flushed
+# to disk as they're written, in order); without it openpyxl's write-only mode is the fallback (pandas'
+# openpyxl engine keeps every cell in memory), and is faster still with lxml installed.
+# Rows that don't fit under Excel's row limit roll over to numbered sheets (data, data_2, data_3, ...).
+@contextlib.contextmanager
+def xlsx_appender(output_path, sheet_name="data"):
+    workbook = None
+    worksheet = None
+    row = EXCEL_MAX_ROWS  # no sheet yet: the first append starts one
+    sheets = 0
+
+    def append(df):
+        nonlocal workbook, worksheet, row, sheets
+        if df.empty:
+            return
+        check_excel_values(df)
+        if workbook is None:
+            backup_existing_output(output_path)
+            if xlsxwriter is not None:
+                workbook = xlsxwriter.Workbook(output_path, {"constant_memory": True, "default_date_format": "yyyy-mm-dd hh:mm:ss"})
             else:
-                output_path += output_file_extension
-        if os.path.exists(output_path):
-            new_timestamp = int(time.time())
-            click.echo(f"Output file already exists: {output_path}, renaming to {output_path}.bak{new_timestamp}")
-            os.rename(output_path, output_path + ".bak" + str(new_timestamp))
-        df = pd.DataFrame(data)
+                import openpyxl
+                workbook = openpyxl.Workbook(write_only=True)
+        start = 0
+        while start < len(df):
+            if row == EXCEL_MAX_ROWS:
+                sheets += 1
+                name = sheet_name if sheets == 1 else f"{sheet_name}_{sheets}"
+                if xlsxwriter is not None:
+                    worksheet = workbook.add_worksheet(name)
+                    worksheet.write_row(0, 0, df.columns.tolist())
+                else:
+                    worksheet = workbook.create_sheet(name)
+                    worksheet.append(df.columns.tolist())
+                row = 1
+            rows = df.iloc[start:start + EXCEL_MAX_ROWS - row]
+            if xlsxwriter is not None:
+                write_xlsxwriter_rows(worksheet, row, rows)
+            else:
+                write_openpyxl_rows(worksheet, rows)
+            row += len(rows)
+            start += len(rows)
+
+    failed = False
+    try:
+        yield append
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        if workbook is not None:
+            if xlsxwriter is not None:
+                workbook.close()  # (also cleans up constant_memory's temporary files)
+            else:
+                workbook.save(output_path)
+            if failed:
+                # Don't leave a partly written workbook behind
+                with contextlib.suppress(OSError):
+                    os.remove(output_path)
+
+
+# Stream DataFrames into a CSV file, writing the header once. A frame that fails part way is cut back
+# out of the file, so it only ever holds whole frames; like xlsx_appender, the file is removed if the
+# writing fails as a whole (or nothing was ever written to it).
+@contextlib.contextmanager
+def csv_appender(output_path):
+    output_file = None
+
+    def append(df):
+        nonlocal output_file
+        if df.empty:
+            return
+        if output_file is None:
+            backup_existing_output(output_path)
+            output_file = open(output_path, "wb")
+        start = output_file.tell()
+        try:
+            write_csv(df, output_file, include_header=start == 0)
+        except BaseException:
+            output_file.seek(start)
+            output_file.truncate()
+            raise
+
+    failed = False
+    try:
+        yield append
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        if output_file is not None:
+            empty = output_file.tell() == 0
+            output_file.close()
+            if failed or empty:
+                with contextlib.suppress(OSError):
+                    os.remove(output_path)
+
+
+def output_appender(output_path, excel_mode):
+    return xlsx_appender(output_path) if excel_mode else csv_appender(output_path)
+
+
+# Parse one log file into per-column lists. Returns (data, errors).
+# Kept at module level (and free of shared state) so it can run in a worker process.
+# The progress bar is time-throttled by tqdm, so the hot loop only pays for a counter increment.
+def parse_log_file(log_file, board_type, merged, show_progress=True):
+    errors = []
+    # Pre-size the column lists from the file size and fill them by index (growing if the estimate
+    # falls short), instead of repeatedly reallocating them while appending
+    capacity = max(os.path.getsize(log_file) // ESTIMATED_LINE_BYTES, 1)
+    columns = [[None] * capacity for _ in range(4)]
+    i2c_addresses, timestamps, values, si_units = columns
+    rows = 0
+    parse_line = parse_log_line
+    line_count = 0
+    lines = iter_log_lines(log_file)
+    progress = tqdm(desc=os.path.basename(log_file), unit=" lines", mininterval=0.5, disable=not show_progress)
+    # Lines are parsed a batch at a time inside a single try, so well-formed logs don't pay for
+    # exception handling per line. A batch that fails is rolled back and redone line by line to find the bad lines.
+    while batch := list(islice(lines, PARSE_BATCH_LINES)):
+        if rows + len(batch) > capacity:
+            extra = max(capacity, len(batch))
+            for column in columns:
+                column.extend([None] * extra)
+            capacity += extra
+        batch_start = rows
+        try:
+            for line in batch:
+                i2c_addresses[rows], timestamps[rows], values[rows], si_units[rows] = parse_line(line)
+                rows += 1
+            failed = False
+        except Exception:
+            failed = True
+        # (redone outside the except block, so the failed parse's traceback, and any simdjson
+        # document it references, has been released before the shared parser is used again)
+        if failed:
+            rows = batch_start
+            for i, line in enumerate(batch, start=line_count):
+                try:
+                    i2c_addresses[rows], timestamps[rows], values[rows], si_units[rows] = parse_line(line)
+                    rows += 1
+                except Exception as e:
+                    # Just collected (with the offending line) and summarised at the end: printing a
+                    # traceback and pausing per bad line made damaged logs take hours to get through
+                    errors.append(f"Error processing line {i+1} of {log_file}: {e} [line: {line[:200].decode(errors='replace')}]")
+        line_count += len(batch)
+        progress.update(len(batch))
+    progress.close()
+    print(f"Finished processing {line_count} lines from {log_file}" + (f" ({len(errors)} bad lines)" if errors else ""))
+    for column in columns:
+        del column[rows:]
+    data = {"Timestamp": timestamps, "Value": values, "SI Unit": si_units, "I2C Address": i2c_addresses}
+    # Board and Filename are the same for every row of a file, so fill them once rather than per line
+    data["Board"] = [board_type if board_type != "Unknown Board" else None] * rows
+    data["Filename"] = [os.path.basename(log_file) if merged else None] * rows
+    return data, errors
+
+
+# Parse log files in order, yielding (log_file, data, errors) for each.
+# Files parse independently, so spread them over a process pool when there is enough data to
+# outweigh the worker start-up cost. Results still come back (and are written) in file order.
+def parse_log_files(log_files, board_type, merged):
+    parallel = len(log_files) > 1 and sum(os.path.getsize(f) for f in log_files) >= PARALLEL_MIN_BYTES
+    if not parallel:
+        for log_file in log_files:
+            yield (log_file, *parse_log_file(log_file, board_type, merged))
+        return
+    workers = min(os.cpu_count() or 1, len(log_files), MAX_PARSE_WORKERS)
+    with contextlib.ExitStack() as stack:
+        executor = stack.enter_context(ProcessPoolExecutor(workers))
+        # If the caller stops early (e.g. to redo merged output as CSV), don't parse the rest
+        stack.callback(executor.shutdown, cancel_futures=True)
+        # Per-line progress bars from several workers would garble each other, so show per-file progress instead
+        progress = stack.enter_context(tqdm(desc="Parsing log files", total=len(log_files), unit=" files"))
+        # Only one file per worker (plus the one being waited on) is in flight, and the next is submitted
+        # as each result is handed over, so parsed results don't pile up while the writer catches up
+        pending = collections.deque()
+
+        def next_result():
+            log_file, future = pending.popleft()
+            data, file_errors = future.result()
+            progress.update()
+            return log_file, data, file_errors
+
+        for log_file in log_files:
+            pending.append((log_file, executor.submit(parse_log_file, log_file, board_type, merged, False)))
+            if len(pending) > workers:
+                yield next_result()
+        while pending:
+            yield next_result()
+
+
+# Text format of the DateTime column in CSV output (whole seconds, as the timestamps are)
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# Text of a column pyarrow can't write directly (mixed types, e.g. "Unknown" among numeric values, or
+# list/object values) as a string array. Floats are formatted by pyarrow and ints by str(), which is
+# the same text pyarrow gives them in a purely numeric column, so a value reads the same either way.
+def csv_text_array(column):
+    values = column.astype(object)
+    text = values.map(str, na_action="ignore")
+    floats = values.map(lambda value: type(value) is float) & values.notna()
+    if floats.any():
+        text[floats] = pa.array(values[floats].astype("float64")).cast(pa.string()).to_pylist()
+    return pa.array(text, type=pa.string(), from_pandas=True)
+
+
+def is_arrow_text(arrow_type):
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+# Convert a DataFrame to a pyarrow Table for CSV output. Every column except DateTime is written as
+# text, so each cell is quoted the same way whichever types a particular frame's column ended up
+# with, and appended frames read alike. Datetimes are cast to whole seconds so they print as
+# "YYYY-MM-DD HH:MM:SS" whatever resolution pandas stored them in.
+def csv_arrow_table(df):
+    arrays = []
+    for name in df.columns:
+        column = df[name]
+        try:
+            array = pa.array(column, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            array = None
+        if array is None:
+            array = csv_text_array(column)
+        elif pa.types.is_timestamp(array.type):
+            array = array.cast(pa.timestamp("s"), safe=False)
+        elif pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+            array = array.cast(pa.string())
+        elif not (is_arrow_text(array.type)
+                  or (pa.types.is_dictionary(array.type) and is_arrow_text(array.type.value_type))):
+            # bool, null, nested (list/struct) and non-text categories: the writer can't print
+            # nested types at all, and the rest would otherwise be unquoted or spelled differently
+            array = csv_text_array(column)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=[str(name) for name in df.columns])
+
+
+# Write a DataFrame as CSV to a binary file, via pyarrow when it is installed. The backend only depends
+# on what is installed, so frames appended to the same file always go through the same writer.
+def write_csv(df, output_file, include_header=True):
+    if pa is not None:
+        pa_csv.write_csv(csv_arrow_table(df), output_file, pa_csv.WriteOptions(include_header=include_header))
+    else:
+        df.to_csv(output_file, index=False, header=include_header, date_format=CSV_DATE_FORMAT)
+
+
+# Resolve the final output file path (adding the extension / log file name as needed)
+def prepare_output_path(log_path, output_file_extension, output_path):
+    if not output_path.endswith(output_file_extension):
+        if os.path.isdir(output_path):
+            output_path = os.path.join(output_path, os.path.basename(log_path) + output_file_extension)
+        else:
+            output_path += output_file_extension
+    return output_path
+
+
+# Back up any existing file at output_path, just before it is overwritten.
+# A single os.replace avoids the race (and extra stat) of exists()+rename().
+def backup_existing_output(output_path):
+    backup_path = f"{output_path}.bak{int(time.time())}"
+    try:
+        os.replace(output_path, backup_path)
+        click.echo(f"Output file already exists: {output_path}, renamed to {backup_path}")
+    except FileNotFoundError:
+        pass
+
+
+# Save a DataFrame to Excel/CSV
+def write_data_to_file(log_path, output_file_extension,output_path,excel_mode,df):
+    if not df.empty:
+        output_path = prepare_output_path(log_path, output_file_extension, output_path)
         if excel_mode:
             print("Writing data to Excel...(this may take a while)")
             try:
-                df.to_excel(output_path, index=False,)
+                with xlsx_appender(output_path) as append:
+                    append(df)
                 print(f"Excel file saved to {output_path}")
             except Exception as e:
                 traceback.print_exc()
-                # TODO: split at 1.04million row limit per sheet into new sheet (better for XlsWriter progress bar)
-                #if e.__class__.__name__ == "ValueError" and "This sheet is too large" in e:
                 print(f"*** Failed to save Excel file, attempting CSV instead. Original Error: {e}")
-                return write_data_to_file(log_path,'.csv',output_path[:-5]+'.csv',excel_mode=False,data=data)
+                return write_data_to_file(log_path,'.csv',output_path[:-5]+'.csv',excel_mode=False,df=df)
         else:
             print("Writing data to CSV...(usually fairly quick)")
             try:
-                df.to_csv(output_path, index=False)
+                with csv_appender(output_path) as append:
+                    append(df)
                 print(f"CSV file saved to {output_path}")
             except:
                 traceback.print_exc()
@@ -73,6 +560,53 @@ def write_data_to_file(log_path, output_file_extension,output_path,excel_mode,da
         print("No data to write.")
         return False
 
+
+# Save every log file to a single Excel/CSV file, written log file by log file as each is parsed rather
+# than building one DataFrame of every row first, so its optional columns are decided up front.
+# Returns the list of errors. If Excel output fails part way, the workbook is discarded and the whole
+# output is redone as CSV, as write_data_to_file does.
+def write_merged_output(log_path, output_file_extension, output_path, excel_mode, log_files, board_type, i2c_mapping):
+    output_path = prepare_output_path(log_path, output_file_extension, output_path)
+    columns = [column for column in LOG_COLUMNS
+               if (column not in ("Component", "Component@Address") or i2c_mapping)
+               and (column != "Board" or board_type != "Unknown Board")]
+    errors = []
+    rows = 0
+    print(f"Writing merged data to {output_path} as log files are processed...")
+    try:
+        with output_appender(output_path, excel_mode) as append:
+            for log_file, data, file_errors in parse_log_files(log_files, board_type, True):
+                errors.extend(file_errors)
+                try:
+                    df = columns_to_dataframe(data, i2c_mapping, columns)
+                except Exception as e:
+                    traceback.print_exc()
+                    errors.append(f"Failed to convert data from {log_file}: {e}")
+                    continue
+                if excel_mode:
+                    append(df)  # a failed append leaves the workbook unusable, so it aborts the whole file
+                else:
+                    try:
+                        append(df)
+                    except Exception as e:
+                        traceback.print_exc()
+                        errors.append(f"Failed to write {log_file} to outputfile {output_path}: {e}")
+                        continue
+                rows += len(df)
+    except Exception as e:
+        traceback.print_exc()
+        if excel_mode:
+            print(f"*** Failed to save Excel file, attempting CSV instead. Original Error: {e}")
+            return write_merged_output(log_path, '.csv', output_path[:-5] + '.csv', False, log_files, board_type, i2c_mapping)
+        errors.append(f"Failed to write outputfile {output_path}({output_file_extension}): {e}")
+        return errors
+    if rows:
+        print(f"{'Excel' if excel_mode else 'CSV'} file saved to {output_path} [{rows} rows]")
+    else:
+        print("No data to write.")
+        errors.append(f"Failed to write outputfile {output_path}({output_file_extension}) [data len: 0]")
+    return errors
+
 @click.command()
 @click.argument('log-path',  type=click.Path(exists=True), required=False)
 @click.argument('output-path',  type=click.Path(), required=False)
@@ -133,8 +667,9 @@ def jsonl_to_xlsx(config_path, log_path, output_path, wipper_boot_path,interacti
                 config_data = json.load(f)
 
     i2c_mapping = {
-        comp.get("i2cDeviceAddress"): comp.get("name", "Unknown") for comp in config_data.get("components", [])
+        normalize_i2c_address(comp.get("i2cDeviceAddress")): comp.get("name", "Unknown") for comp in config_data.get("components", [])
     }
+    i2c_mapping.pop(None, None)  # components without a usable I2C address
     print(f"Loaded {len(i2c_mapping)} I2C address mappings from config file.")
 
     # Extract board type from config or wipper_boot_out.txt
@@ -164,63 +699,37 @@ def jsonl_to_xlsx(config_path, log_path, output_path, wipper_boot_path,interacti
 
     print(f"Found {len(log_files)} log files to process.")
     errors = []
-    data = []
+    found_log_files = []
     for log_file in log_files:
-        if not merged:
-            data = []
         if os.path.exists(log_file):
-            with open(log_file, "r") as f:
-                for i, line in enumerate(f):
-                    if i==0 or (i + 1) % 1000 == 0:
-                        print(f"Processing line {i+1} of {log_file}...")
-                    try:
-                        entry = json.loads(line.strip())
-                        # Extract relevant fields
-                        i2c_address = entry.get("i2c_address", "Unknown")
-                        component_name = i2c_mapping.get(i2c_address, "Unknown")
-
-                        structured_entry = {
-                            "DateTime": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.get("timestamp",0))),
-                            "Timestamp": entry.get("timestamp", "Unknown"),
-                            "Value": entry.get("value", "Unknown"),
-                            "SI Unit": entry.get("si_unit", "Unknown"),
-                            "I2C Address": i2c_address
-                        }
-                        if component_name != "Unknown":
-                            structured_entry["Component"] = component_name
-                            structured_entry["Component@Address"] = f"{component_name}@{i2c_address}"
-                        if board_type != "Unknown Board":
-                            structured_entry["Board"] = board_type
-                        if merged:
-                            structured_entry["Filename"] = os.path.basename(log_file)
-
-                        data.append(structured_entry)
-                    except Exception as e:
-                        errors.append(f"Error processing line {i+1} of {log_file}: {e}")
-                        print(f"Error processing line {i+1} of {log_file}: {e}")
-                        traceback.print_exc()
-                        print(f"Line {i+1} content (pausing for 3secs to allow reading error/line):\n{line}")
-                        time.sleep(3)
-            print(f"Finished processing {i+1} lines from {log_file}")
-            if not merged:
-                # TODO: check output_path is dir and add logname then extension, otherwise if isfile (but recurse=True) assume one worksheet per filename (16k limit)
-                if os.path.isdir(output_path):
-                    new_output_path = os.path.join(output_path, log_file + output_file_extension)
-                else:
-                    new_output_path = output_path
-                if not write_data_to_file(log_path,output_file_extension,new_output_path,excel_mode,data):
-                    errors.append(f"Failed to write outputfile {output_path}({output_file_extension}) from {log_file} [data len: {len(data)}]")
+            found_log_files.append(log_file)
         else:
             print(f"Log file not found: {log_file}")
 
     if merged:
-        if not write_data_to_file(log_path,output_file_extension,output_path,excel_mode,data):
-            errors.append(f"Failed to write outputfile {output_path}({output_file_extension}) from {log_file} [data len: {len(data)}]")
+        errors.extend(write_merged_output(log_path, output_file_extension, output_path, excel_mode,
+                                          found_log_files, board_type, i2c_mapping))
+    else:
+        for log_file, data, file_errors in parse_log_files(found_log_files, board_type, merged):
+            errors.extend(file_errors)
+            try:
+                df = columns_to_dataframe(data, i2c_mapping)
+            except Exception as e:
+                traceback.print_exc()
+                errors.append(f"Failed to convert data from {log_file}: {e}")
+                continue
+            # TODO: check output_path is dir and add logname then extension, otherwise if isfile (but recurse=True) assume one worksheet per filename (16k limit)
+            if os.path.isdir(output_path):
+                new_output_path = os.path.join(output_path, log_file + output_file_extension)
+            else:
+                new_output_path = output_path
+            if not write_data_to_file(log_path,output_file_extension,new_output_path,excel_mode,df):
+                errors.append(f"Failed to write outputfile {output_path}({output_file_extension}) from {log_file} [data len: {len(data['Timestamp'])}]")
 
     print("*** Conversion complete ***")
     if errors:
-        print(f"*** Caught {len(errors)} Processing Errors:")
-        print(errors)
+        print(f"*** Caught {len(errors)} Processing Errors" + (f", first {MAX_REPORTED_ERRORS}:" if len(errors) > MAX_REPORTED_ERRORS else ":"))
+        print("\n".join(errors[:MAX_REPORTED_ERRORS]))
 
 if __name__ == '__main__':
     jsonl_to_xlsx()